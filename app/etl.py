@@ -1,11 +1,21 @@
+import functools
+import json
 import os
+import queue
+import random
+import re
 import sys
+import threading
 import time
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import uuid
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Final, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from neo4j import GraphDatabase, Driver
+from psycopg2.pool import ThreadedConnectionPool
+from neo4j import GraphDatabase, Driver, Session
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -13,32 +23,213 @@ from pathlib import Path
 load_dotenv(override=True)
 
 
+@dataclass(frozen=True)
+class Settings:
+    """Environment snapshot taken once at import time."""
+
+    pg_dsn: Dict[str, Any]
+    pg_pool_max: int
+    neo4j_uri: str
+    neo4j_user: str
+    neo4j_password: str
+    neo4j_pool: int
+    batch_size: Optional[int]  # None: size each table's batches from its row width
+    etl_workers: int
+    queries_path: str
+
+
+# Prefer local queries.cypher next to this file; fallback to env/default path
+LOCAL_QUERIES_PATH: Final[Path] = Path(__file__).with_name("queries.cypher")
+
+SETTINGS = Settings(
+    pg_dsn={
+        "dbname": os.getenv("POSTGRES_DB", "postgres"),
+        "user": os.getenv("POSTGRES_USER", "postgres"),
+        "password": os.getenv("POSTGRES_PASSWORD", "postgres"),
+        "host": os.getenv("POSTGRES_HOST", "postgres"),
+        "port": int(os.getenv("POSTGRES_PORT", "5432")),
+    },
+    pg_pool_max=int(os.getenv("PG_POOL_MAX", "8")),
+    neo4j_uri=os.getenv("NEO4J_URI", "bolt://neo4j:7687"),
+    neo4j_user=os.getenv("NEO4J_USER", "neo4j"),
+    neo4j_password=os.getenv("NEO4J_PASSWORD", "neo4j"),
+    neo4j_pool=int(os.getenv("NEO4J_POOL", "32")),
+    batch_size=int(os.environ["BATCH_SIZE"]) if os.getenv("BATCH_SIZE") else None,
+    etl_workers=int(os.getenv("ETL_WORKERS", "4")),
+    queries_path=str(
+        LOCAL_QUERIES_PATH
+        if LOCAL_QUERIES_PATH.exists()
+        else Path(os.getenv("QUERIES_PATH", "/workspace/app/queries.cypher"))
+    ),
+)
+
+
+# Cypher templates for each load, built once so every batch sends identical
+# query text (and hits Neo4j's query plan cache)
+CYPHER_CATEGORIES: Final[str] = """
+UNWIND $rows AS row
+MERGE (c:Category {id: row.id})
+SET c.name = row.name
+"""
+
+CYPHER_CUSTOMERS: Final[str] = """
+UNWIND $rows AS row
+MERGE (c:Customer {id: row.id})
+SET c.name = row.name,
+    c.join_date = row.join_date
+"""
+
+# Product nodes and their IN_CATEGORY link in one pass;
+# the Category lookup is backed by category_id_unique
+CYPHER_PRODUCTS: Final[str] = """
+UNWIND $rows AS row
+MERGE (p:Product {id: row.id})
+SET p.name = row.name,
+    p.category_id = row.category_id
+WITH p, row
+MATCH (c:Category {id: row.category_id})
+MERGE (p)-[:IN_CATEGORY]->(c)
+"""
+
+CYPHER_ORDERS: Final[str] = """
+UNWIND $rows AS row
+MERGE (o:Order {id: row.id})
+SET o.ts = row.ts
+WITH o, row
+MATCH (c:Customer {id: row.customer_id})
+MERGE (c)-[:PLACED]->(o)
+"""
+
+CYPHER_ORDER_ITEMS: Final[str] = """
+UNWIND $rows AS row
+MATCH (o:Order {id: row.order_id})
+MATCH (p:Product {id: row.product_id})
+MERGE (o)-[r:CONTAINS]->(p)
+SET r.quantity = row.quantity
+"""
+
+CYPHER_VIEWED: Final[str] = """
+UNWIND $rows AS row
+MATCH (c:Customer {id: row.customer_id})
+MATCH (p:Product {id: row.product_id})
+MERGE (c)-[:VIEWED]->(p)
+"""
+
+CYPHER_CLICKED: Final[str] = """
+UNWIND $rows AS row
+MATCH (c:Customer {id: row.customer_id})
+MATCH (p:Product {id: row.product_id})
+MERGE (c)-[:CLICKED]->(p)
+"""
+
+CYPHER_ADDED_TO_CART: Final[str] = """
+UNWIND $rows AS row
+MATCH (c:Customer {id: row.customer_id})
+MATCH (p:Product {id: row.product_id})
+MERGE (c)-[:ADDED_TO_CART]->(p)
+"""
+
+# Map Postgres event types to their relationship load
+REL_CYPHER: Final[Dict[str, str]] = {
+    "view": CYPHER_VIEWED,
+    "click": CYPHER_CLICKED,
+    "add_to_cart": CYPHER_ADDED_TO_CART,
+}
+
+
 def log(message: str) -> None:
     print(f"[ETL] {message}")
 
 
-def get_pg_conn():
-    conn = psycopg2.connect(
-        dbname=os.getenv("POSTGRES_DB", "postgres"),
-        user=os.getenv("POSTGRES_USER", "postgres"),
-        password=os.getenv("POSTGRES_PASSWORD", "postgres"),
-        host=os.getenv("POSTGRES_HOST", "postgres"),
-        port=int(os.getenv("POSTGRES_PORT", "5432")),
-        cursor_factory=RealDictCursor,
-    )
-    conn.autocommit = True
+_PG_POOL: Optional[ThreadedConnectionPool] = None
+_PG_POOL_LOCK = threading.Lock()
+# ThreadedConnectionPool raises PoolError when exhausted; callers queue here instead
+_PG_POOL_SLOTS = threading.BoundedSemaphore(SETTINGS.pg_pool_max)
+
+
+def get_pg_pool() -> ThreadedConnectionPool:
+    """Return the process-wide Postgres pool, creating it on first use."""
+    global _PG_POOL
+    with _PG_POOL_LOCK:
+        if _PG_POOL is None:
+            _PG_POOL = ThreadedConnectionPool(
+                minconn=1,
+                maxconn=SETTINGS.pg_pool_max,
+                **SETTINGS.pg_dsn,
+            )
+        return _PG_POOL
+
+
+def close_pg_pool() -> None:
+    global _PG_POOL
+    with _PG_POOL_LOCK:
+        if _PG_POOL is not None:
+            _PG_POOL.closeall()
+            _PG_POOL = None
+
+
+def _checkout(pool: ThreadedConnectionPool) -> Any:
+    conn = pool.getconn()
+    try:
+        conn.autocommit = True
+        # Idle pooled connections go stale when Postgres restarts under the API
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+    except psycopg2.Error:
+        pool.putconn(conn, close=True)
+        raise
     return conn
 
 
+@contextmanager
+def get_pg_conn() -> Iterator[Any]:
+    """Borrow a pooled connection (autocommit on) and return it to the pool afterwards.
+
+    Blocks while all ``PG_POOL_MAX`` connections are in use. A connection
+    that fails its liveness check is discarded and replaced once.
+    """
+    with _PG_POOL_SLOTS:
+        pool = get_pg_pool()
+        try:
+            conn = _checkout(pool)
+        except psycopg2.Error:
+            conn = _checkout(pool)
+        try:
+            yield conn
+        finally:
+            # Broken connections are dropped instead of being handed out again
+            pool.putconn(conn, close=bool(conn.closed))
+
+
 def get_neo4j_driver() -> Driver:
-    uri = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
-    user = os.getenv("NEO4J_USER", "neo4j")
-    password = os.getenv("NEO4J_PASSWORD", "neo4j")
-    return GraphDatabase.driver(uri, auth=(user, password))
+    uri = SETTINGS.neo4j_uri
+    config: Dict[str, Any] = {}
+    # In-cluster plain bolt:// or neo4j:// URIs skip TLS negotiation; the driver
+    # rejects an explicit `encrypted` setting on +s/+ssc schemes
+    if "+s" not in uri.split("://", 1)[0]:
+        config["encrypted"] = False
+    return GraphDatabase.driver(
+        uri,
+        auth=(SETTINGS.neo4j_user, SETTINGS.neo4j_password),
+        # Room for the parallel loaders plus API sessions
+        max_connection_pool_size=SETTINGS.neo4j_pool,
+        connection_acquisition_timeout=60,
+        max_connection_lifetime=3600,
+        fetch_size=10_000,
+        user_agent="graphdb-etl/1",
+        **config,
+    )
+
 
+def _backoff(delay: float, max_delay: float) -> float:
+    """Sleep for ``delay`` plus up to 50% jitter and return the next, capped delay."""
+    time.sleep(delay + random.uniform(0, delay / 2))
+    return min(delay * 1.8, max_delay)
 
-def wait_for_postgres(timeout_seconds: int = 120, backoff_seconds: float = 2.0) -> None:
+
+def wait_for_postgres(timeout_seconds: int = 120, initial_delay: float = 0.2, max_delay: float = 4.0) -> None:
     start = time.time()
+    delay = initial_delay
     while True:
         try:
             with get_pg_conn() as conn:
@@ -51,14 +242,23 @@ def wait_for_postgres(timeout_seconds: int = 120, backoff_seconds: float = 2.0)
             if time.time() - start > timeout_seconds:
                 raise RuntimeError(f"Timed out waiting for Postgres: {e}")
             log(f"Waiting for Postgres... ({e})")
-            time.sleep(backoff_seconds)
-
-
-def wait_for_neo4j(timeout_seconds: int = 120, backoff_seconds: float = 2.0) -> Driver:
+            delay = _backoff(delay, max_delay)
+
+
+def wait_for_neo4j(
+    driver: Optional[Driver] = None,
+    timeout_seconds: int = 120,
+    initial_delay: float = 0.2,
+    max_delay: float = 4.0,
+) -> Driver:
+    """Probe Neo4j until it answers, reusing one driver for every attempt."""
+    owns_driver = driver is None
+    if driver is None:
+        driver = get_neo4j_driver()
     start = time.time()
+    delay = initial_delay
     while True:
         try:
-            driver = get_neo4j_driver()
             # Verify connectivity (Neo4j >= 4.x)
             driver.verify_connectivity()
             with driver.session() as session:
@@ -67,9 +267,11 @@ def wait_for_neo4j(timeout_seconds: int = 120, backoff_seconds: float = 2.0) ->
             return driver
         except Exception as e:
             if time.time() - start > timeout_seconds:
+                if owns_driver:
+                    driver.close()
                 raise RuntimeError(f"Timed out waiting for Neo4j: {e}")
             log(f"Waiting for Neo4j... ({e})")
-            time.sleep(backoff_seconds)
+            delay = _backoff(delay, max_delay)
 
 
 def run_cypher(driver: Driver, query: str, params: Optional[Dict[str, Any]] = None) -> None:
@@ -77,214 +279,314 @@ def run_cypher(driver: Driver, query: str, params: Optional[Dict[str, Any]] = No
         session.run(query, params or {}).consume()
 
 
-def run_cypher_file(driver: Driver, path: str) -> None:
+def write_batch(session: Session, query: str, rows: List[Dict[str, Any]]) -> None:
+    """Run one UNWIND batch as a managed write transaction (retried on transient errors)."""
+    session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+
+
+@functools.lru_cache(maxsize=4)
+def _read_text(path: str, mtime: float) -> str:
+    # mtime is part of the cache key so edits to the file are picked up
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def iter_statements(text: str) -> Iterator[str]:
+    """Yield the ``;``-separated statements of a Cypher script one at a time.
+
+    Semicolons inside string literals, backtick-quoted names and comments do
+    not end a statement; ``//`` and ``/* */`` comments are dropped.
+    """
+    buf: List[str] = []
+    quote: Optional[str] = None  # active ', " or ` delimiter
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if quote is not None:
+            buf.append(ch)
+            if ch == "\\" and quote != "`" and i + 1 < n:
+                buf.append(text[i + 1])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+            buf.append(ch)
+        elif text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            buf.append(" ")
+            continue
+        elif ch == ";":
+            stmt = "".join(buf).strip()
+            if stmt:
+                yield stmt
+            buf = []
+        else:
+            buf.append(ch)
+        i += 1
+    stmt = "".join(buf).strip()
+    if stmt:
+        yield stmt
+
+
+_SCHEMA_NAME = re.compile(r"CREATE\s+(?:CONSTRAINT|INDEX)\s+(\w+)", re.IGNORECASE)
+
+
+def schema_applied(driver: Driver, path: str) -> bool:
+    """True when every named constraint/index created by the script already exists.
+
+    Checked against SHOW CONSTRAINTS / SHOW INDEXES, so a reset Neo4j database
+    gets its schema back on the next run.
+    """
+    if not os.path.exists(path):
+        return False
+    content = _read_text(path, os.path.getmtime(path))
+    wanted = {m.group(1) for m in map(_SCHEMA_NAME.match, iter_statements(content)) if m}
+    if not wanted:
+        return False
+    with driver.session() as session:
+        existing = {r["name"] for r in session.run("SHOW CONSTRAINTS YIELD name")}
+        existing.update(r["name"] for r in session.run("SHOW INDEXES YIELD name"))
+    return wanted <= existing
+
+
+def run_cypher_file(driver: Driver, path: str) -> bool:
+    """Run every statement of a Cypher script; False if the file is missing."""
     if not os.path.exists(path):
         log(f"Cypher file not found: {path}")
-        return
-    content = open(path, "r", encoding="utf-8").read()
-    # Naive split on ';' is acceptable for simple DDL
-    statements = [s.strip() for s in content.split(";") if s.strip()]
-    for stmt in statements:
+        return False
+    content = _read_text(path, os.path.getmtime(path))
+    for stmt in iter_statements(content):
         run_cypher(driver, stmt)
+    return True
+
+
+# Aim each UNWIND payload at roughly this many serialized bytes
+TARGET_BATCH_BYTES: Final[int] = 512 * 1024
+
+
+def estimate_batch_size(row: Dict[str, Any]) -> int:
+    """Rows per batch so that a batch of rows like ``row`` is ~TARGET_BATCH_BYTES."""
+    row_bytes = max(1, len(json.dumps(row, default=str)))
+    return max(100, min(10_000, TARGET_BATCH_BYTES // row_bytes))
+
+
+def iter_rows(
+    conn, sql: str, size: Optional[int], params: Optional[Sequence[Any]] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """Stream query results in batches through a server-side (named) cursor.
+
+    Rows arrive as plain tuples and become UNWIND payload dicts with one zip
+    per row, using the column names read once from the cursor description.
+    When ``size`` is None it is estimated from the first row.
+    """
+    with conn.cursor(name=f"etl_{uuid.uuid4().hex}") as cur:
+        cur.execute(sql, params)
+        columns: Optional[List[str]] = None
+        pending: List[Tuple[Any, ...]] = []
+        if size is None:
+            pending = cur.fetchmany(1)
+            if not pending:
+                return
+            columns = [col[0] for col in cur.description]
+            size = estimate_batch_size(dict(zip(columns, pending[0])))
+        cur.itersize = size
+        while True:
+            rows = pending + cur.fetchmany(size - len(pending))
+            pending = []
+            if not rows:
+                break
+            if columns is None:
+                columns = [col[0] for col in cur.description]
+            yield [dict(zip(columns, row)) for row in rows]
+
+
+def prefetch(batches: Iterator[List[Dict[str, Any]]], depth: int = 4) -> Iterator[List[Dict[str, Any]]]:
+    """Pull batches on a background thread so the next fetch overlaps the current load.
+
+    At most ``depth`` batches are buffered; errors raised by the producer are
+    re-raised in the consuming thread.
+    """
+    buffer: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item: Tuple[str, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for batch in batches:
+                if not put(("batch", batch)):
+                    return
+            put(("done", None))
+        except BaseException as e:
+            put(("error", e))
+        finally:
+            close = getattr(batches, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="etl-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, item = buffer.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
 
 
-def chunked(iterable: Sequence[Dict[str, Any]], size: int) -> Iterable[Sequence[Dict[str, Any]]]:
-    for i in range(0, len(iterable)):
-        if i % size == 0:
-            yield iterable[i : i + size]
+Loader = Callable[[Session, List[Dict[str, Any]]], None]
 
 
-def chunk(iterable: Sequence[Dict[str, Any]], size: int) -> Iterable[Sequence[Dict[str, Any]]]:
-    """Alias to match requested API name; splits sequences into batches of given size."""
-    return chunked(iterable, size)
+class LoadTask(NamedTuple):
+    name: str
+    sql: str
+    load: Loader
+    params: Optional[Sequence[Any]] = None
+    # Earlier tasks whose nodes this one only MATCHes; skipped if any loaded nothing
+    requires: Tuple[str, ...] = ()
 
 
-def fetch_all(cur, sql: str) -> List[Dict[str, Any]]:
-    cur.execute(sql)
-    rows = cur.fetchall()
-    return list(rows)
+def merge(query: str) -> Loader:
+    """Loader that writes each batch through a single UNWIND query."""
+    return lambda session, batch: write_batch(session, query, batch)
 
 
-def etl() -> None:
+def load_table(driver: Driver, task: LoadTask, batch_size: Optional[int]) -> int:
+    """Stream one Postgres query into Neo4j and return the number of rows loaded.
+
+    Uses its own pooled Postgres connection and Neo4j session so several
+    tables can be loaded concurrently. Extraction errors are logged and the
+    table is skipped, as before.
+    """
+    name = task.name
+    log(f"Loading {name}...")
+    count = 0
+    with get_pg_conn() as conn:
+        # Server-side (named) cursors only live inside a transaction
+        conn.autocommit = False
+        try:
+            # One session per table; each batch is its own managed transaction
+            with driver.session() as session:
+                for batch in prefetch(iter_rows(conn, task.sql, batch_size, task.params)):
+                    task.load(session, batch)
+                    count += len(batch)
+        except psycopg2.Error as e:
+            log(f"Warning: could not fetch {name}: {e}")
+            return count
+        finally:
+            # Read-only extraction: nothing to commit (and nothing to roll back
+            # if the connection dropped mid-load)
+            if not conn.closed:
+                conn.rollback()
+    log(f"Loaded {count} {name}")
+    return count
+
+
+def etl(driver: Optional[Driver] = None) -> None:
+    """Run the full Postgres -> Neo4j load.
+
+    A caller-provided ``driver`` is reused and left open; otherwise one is
+    created for this run and closed at the end.
+    """
     # 1) Wait for both DBs
     wait_for_postgres()
-    driver = wait_for_neo4j()
+    owns_driver = driver is None
+    driver = wait_for_neo4j(driver)
 
     try:
         # 2) Apply queries.cypher
-        # Prefer local queries.cypher next to this file; fallback to env/default path
-        local_queries = Path(__file__).with_name("queries.cypher")
-        queries_path = str(local_queries if local_queries.exists() else Path(os.getenv("QUERIES_PATH", "/workspace/app/queries.cypher")))
-        log("Applying Neo4j constraints and indexes...")
-        run_cypher_file(driver, queries_path)
-
-        # 3) Extract from Postgres
-        log("Extracting data from Postgres...")
-        with get_pg_conn() as conn:
-            with conn.cursor() as cur:
-                customers = []
-                products = []
-                categories = []
-                orders = []
-                order_items = []
-                events = []
-
-                def safe_fetch(name: str, sql: str) -> List[Dict[str, Any]]:
-                    try:
-                        rows = fetch_all(cur, sql)
-                        log(f"Fetched {len(rows)} {name}")
-                        return rows
-                    except Exception as e:
-                        log(f"Warning: could not fetch {name}: {e}")
-                        return []
-
-                customers = safe_fetch(
-                    "customers",
-                    "SELECT id, name, join_date FROM customers",
-                )
-                products = safe_fetch(
-                    "products",
-                    "SELECT id, name, category_id FROM products",
-                )
-                categories = safe_fetch(
-                    "categories",
-                    "SELECT id, name FROM categories",
-                )
-                orders = safe_fetch(
-                    "orders",
-                    "SELECT id, customer_id, ts FROM orders",
-                )
-                order_items = safe_fetch(
+        # DDL is idempotent (IF NOT EXISTS); skip resending it when it is all in place
+        if schema_applied(driver, SETTINGS.queries_path):
+            log("Neo4j constraints and indexes already in place")
+        else:
+            log("Applying Neo4j constraints and indexes...")
+            run_cypher_file(driver, SETTINGS.queries_path)
+
+        # 3) Stream rows from Postgres and load them into Neo4j (MERGE + batching)
+        batch_size = SETTINGS.batch_size
+
+        # Tasks within a phase MERGE disjoint node labels and only MATCH nodes
+        # created by earlier phases, so they load in parallel. Relationship loads
+        # all lock the same :Product (and :Customer) endpoints, so each runs in
+        # its own phase rather than relying on deadlock retries.
+        phases: List[List[LoadTask]] = [
+            [
+                LoadTask("categories", "SELECT id, name FROM categories", merge(CYPHER_CATEGORIES)),
+                LoadTask("customers", "SELECT id, name, join_date FROM customers", merge(CYPHER_CUSTOMERS)),
+            ],
+            [
+                LoadTask("products", "SELECT id, name, category_id FROM products", merge(CYPHER_PRODUCTS)),
+                LoadTask("orders", "SELECT id, customer_id, ts FROM orders", merge(CYPHER_ORDERS)),
+            ],
+            [
+                LoadTask(
                     "order_items",
                     "SELECT order_id, product_id, quantity FROM order_items",
+                    merge(CYPHER_ORDER_ITEMS),
+                    requires=("orders", "products"),
+                ),
+            ],
+        ]
+        # Events are partitioned by type in SQL (event_type is CHECK-constrained
+        # to lowercase values), one relationship type per phase
+        phases += [
+            [
+                LoadTask(
+                    f"{event_type} events",
+                    "SELECT customer_id, product_id FROM events WHERE event_type = %s",
+                    merge(cypher),
+                    (event_type,),
+                    requires=("customers", "products"),
                 )
-                events = safe_fetch(
-                    "events",
-                    "SELECT customer_id, product_id, event_type FROM events",
-                )
-
-        # 4) Load nodes and relationships (MERGE + batching)
-        batch_size = int(os.getenv("BATCH_SIZE", "500"))
-
-        log("Loading Categories...")
-        for batch in chunk(categories, batch_size):
-            run_cypher(
-                driver,
-                """
-                UNWIND $rows AS row
-                MERGE (c:Category {id: row.id})
-                SET c.name = row.name
-                """,
-                {"rows": batch},
-            )
+            ]
+            for event_type, cypher in REL_CYPHER.items()
+        ]
 
-        log("Loading Products...")
-        for batch in chunk(products, batch_size):
-            run_cypher(
-                driver,
-                """
-                UNWIND $rows AS row
-                MERGE (p:Product {id: row.id})
-                SET p.name = row.name,
-                    p.category_id = row.category_id
-                """,
-                {"rows": batch},
-            )
-
-        log("Linking Products to Categories...")
-        for batch in chunk(products, batch_size):
-            run_cypher(
-                driver,
-                """
-                UNWIND $rows AS row
-                MATCH (p:Product {id: row.id})
-                MATCH (c:Category {id: row.category_id})
-                MERGE (p)-[:IN_CATEGORY]->(c)
-                """,
-                {"rows": batch},
-            )
-
-        log("Loading Customers...")
-        for batch in chunk(customers, batch_size):
-            run_cypher(
-                driver,
-                """
-                UNWIND $rows AS row
-                MERGE (c:Customer {id: row.id})
-                SET c.name = row.name,
-                    c.join_date = row.join_date
-                """,
-                {"rows": batch},
-            )
-
-        log("Loading Orders...")
-        for batch in chunk(orders, batch_size):
-            run_cypher(
-                driver,
-                """
-                UNWIND $rows AS row
-                MERGE (o:Order {id: row.id})
-                SET o.ts = row.ts
-                WITH o, row
-                MATCH (c:Customer {id: row.customer_id})
-                MERGE (c)-[:PLACED]->(o)
-                """,
-                {"rows": batch},
-            )
-
-        log("Loading Order-Item relationships...")
-        for batch in chunk(order_items, batch_size):
-            run_cypher(
-                driver,
-                """
-                UNWIND $rows AS row
-                MATCH (o:Order {id: row.order_id})
-                MATCH (p:Product {id: row.product_id})
-                MERGE (o)-[r:CONTAINS]->(p)
-                SET r.quantity = row.quantity
-                """,
-                {"rows": batch},
-            )
-
-        # Map events to relationship types
-        event_type_to_rel = {
-            "view": "VIEWED",
-            "click": "CLICKED",
-            "add_to_cart": "ADDED_TO_CART",
-        }
-
-        # Split events by type to keep Cypher simple
-        log("Loading Event relationships...")
-        by_type: Dict[str, List[Dict[str, Any]]] = {t: [] for t in event_type_to_rel}
-        for e in events:
-            t = str(e.get("event_type", "")).lower()
-            if t in by_type:
-                by_type[t].append(e)
-
-        for t, rel in event_type_to_rel.items():
-            data = by_type.get(t, [])
-            if not data:
-                continue
-            log(f"Loading {rel} events...")
-            for batch in chunk(data, batch_size):
-                run_cypher(
-                    driver,
-                    f"""
-                    UNWIND $rows AS row
-                    MATCH (c:Customer {{id: row.customer_id}})
-                    MATCH (p:Product {{id: row.product_id}})
-                    MERGE (c)-[:{rel}]->(p)
-                    """,
-                    {"rows": batch},
-                )
+        log("Extracting data from Postgres...")
+        with ThreadPoolExecutor(max_workers=SETTINGS.etl_workers, thread_name_prefix="etl-load") as executor:
+            loaded: Dict[str, int] = {}
+            for phase in phases:
+                futures: Dict[Future, str] = {}
+                for task in phase:
+                    missing = [name for name in task.requires if not loaded.get(name)]
+                    if missing:
+                        # Its MATCHes could not find anything; don't touch the graph
+                        log(f"Skipping {task.name}: no {', '.join(missing)} loaded")
+                        loaded[task.name] = 0
+                        continue
+                    futures[executor.submit(load_table, driver, task, batch_size)] = task.name
+                if not futures:
+                    continue
+                done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in done:
+                    loaded[futures[future]] = future.result()  # re-raises the first load failure
 
     finally:
-        try:
-            driver.close()
-        except Exception:
-            pass
+        if owns_driver:
+            try:
+                driver.close()
+            except Exception:
+                pass
 
-    # 5) Final required log line
+    # 4) Final required log line
     print("ETL done.")
 
 
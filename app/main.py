@@ -1,22 +1,100 @@
+import asyncio
 import os
+import threading
 import time
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
 
-from fastapi import FastAPI
+from cachetools import TTLCache
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from neo4j import Driver
 from etl import etl as run_etl
+from etl import close_pg_pool
 from etl import get_neo4j_driver as get_driver
 
 app = FastAPI()
 
+# Long-lived Bolt driver shared by all requests (it owns its own connection pool)
+DRIVER: Optional[Driver] = None
+
+# Status of the most recent ETL runs triggered through the API, keyed by task id
+_MAX_TASKS = 100
+_TASKS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+# Only one ETL runs at a time; both are only touched on the event loop
+_ACTIVE_TASK_ID: Optional[str] = None
+
+# Recent /recs results keyed on the seed; TTLCache is not thread-safe and
+# sync endpoints run on a thread pool, hence the lock
+_REC_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_REC_CACHE_LOCK = threading.Lock()
+
+
+@app.on_event("startup")
+def startup():
+    global DRIVER
+    DRIVER = get_driver()
+    try:
+        DRIVER.verify_connectivity()
+    except Exception as e:
+        print(f"[API] Neo4j not reachable yet: {e}")
+
+
+@app.on_event("shutdown")
+def shutdown():
+    close_pg_pool()
+    if DRIVER is not None:
+        DRIVER.close()
+
+
 @app.get("/health")
 def health():
     return {"ok": True}
 
 
-@app.get("/etl")  # checks uses GET; switch to @app.post if you prefer POST (then change checks)
-def trigger_etl():
-    run_etl()           # run synchronously so checks wait for completion
-    return {"ok": True}
+def _set_task(task_id: str, status: Dict[str, Any]) -> None:
+    _TASKS[task_id] = status
+    _TASKS.move_to_end(task_id)
+    # The running task is always the newest entry, so eviction only drops finished ones
+    while len(_TASKS) > _MAX_TASKS:
+        _TASKS.popitem(last=False)
+
+
+async def _run_etl_bg(task_id: str) -> None:
+    global _ACTIVE_TASK_ID
+    # psycopg2 and the sync Neo4j driver block, so keep them off the event loop
+    try:
+        await asyncio.to_thread(run_etl, DRIVER)
+    except Exception as e:
+        _set_task(task_id, {"status": "failed", "error": str(e)})
+    else:
+        _set_task(task_id, {"status": "done"})
+        # The graph changed; drop recommendations computed from the old one
+        with _REC_CACHE_LOCK:
+            _REC_CACHE.clear()
+    finally:
+        _ACTIVE_TASK_ID = None
+
+
+@app.post("/etl")  # returns immediately; poll GET /etl/{task_id} for completion
+async def trigger_etl(background_tasks: BackgroundTasks):
+    global _ACTIVE_TASK_ID
+    # A run is already in progress: hand back its id instead of starting another
+    if _ACTIVE_TASK_ID is not None:
+        return {"ok": True, "task_id": _ACTIVE_TASK_ID, "already_running": True}
+    task_id = str(uuid4())
+    _ACTIVE_TASK_ID = task_id
+    _set_task(task_id, {"status": "running"})
+    background_tasks.add_task(_run_etl_bg, task_id)
+    return {"ok": True, "task_id": task_id}
+
+
+@app.get("/etl/{task_id}")
+def etl_status(task_id: str):
+    task = _TASKS.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Unknown ETL task")
+    return {"task_id": task_id, **task}
 
 
 
@@ -27,6 +105,7 @@ def recs(customer_id: Optional[str] = None, product_id: Optional[str] = None) ->
     - If product_id is provided: try basket co-occurrence, then same-category.
     - If customer_id is provided: recommend co-occurring products not yet purchased.
     - Returns 200 with empty list if no signal or DB not available.
+    - Results are cached per seed for 60s and dropped after each successful ETL run.
 
     TODO: Switch to Personalized PageRank (PPR) when GDS is present:
     - Use gds.graph.project / gds.pageRank to compute personalized scores for a given
@@ -35,20 +114,27 @@ def recs(customer_id: Optional[str] = None, product_id: Optional[str] = None) ->
     started = time.time()
     items: List[Dict] = []
 
-    driver = get_driver()
-    if driver is None:
-        return {"items": [], "took_ms": int((time.time() - started) * 1000)}
-    try:
-        driver.verify_connectivity()
-    except Exception:
-        return {"items": [], "took_ms": int((time.time() - started) * 1000)}
+    if product_id is not None:
+        cache_key: Optional[Tuple[str, str]] = ("p", product_id)
+    elif customer_id is not None:
+        cache_key = ("c", customer_id)
+    else:
+        cache_key = None
 
+    if cache_key is not None:
+        with _REC_CACHE_LOCK:
+            cached = _REC_CACHE.get(cache_key)
+        if cached is not None:
+            return {"items": cached, "took_ms": int((time.time() - started) * 1000)}
+
+    if DRIVER is None:
+        return {"items": [], "took_ms": int((time.time() - started) * 1000)}
 
     try:
-        with driver.session() as session:
+        with DRIVER.session() as session:
             if product_id is not None:
                 # Basket co-occurrence: customers/orders that also contain other products
-                rows = session.run(
+                result = session.run(
                     """
                     MATCH (p:Product {id: $pid})<-[:CONTAINS]-(o:Order)-[:CONTAINS]->(other:Product)
                     WHERE other.id <> $pid
@@ -57,19 +143,18 @@ def recs(customer_id: Optional[str] = None, product_id: Optional[str] = None) ->
                     LIMIT 10
                     """,
                     {"pid": product_id},
-                ).data()
-                if rows:
-                    items = [
-                        {
-                            "product_id": r["product_id"],
-                            "score": float(r["score"]),
-                            "reason": "co-occurrence",
-                        }
-                        for r in rows
-                    ]
-                else:
+                )
+                items = [
+                    {
+                        "product_id": r["product_id"],
+                        "score": float(r["score"]),
+                        "reason": "co-occurrence",
+                    }
+                    for r in result
+                ]
+                if not items:
                     # Same-category fallback
-                    rows = session.run(
+                    result = session.run(
                         """
                         MATCH (p:Product {id: $pid})-[:IN_CATEGORY]->(c)<-[:IN_CATEGORY]-(other:Product)
                         WHERE other.id <> $pid
@@ -77,59 +162,62 @@ def recs(customer_id: Optional[str] = None, product_id: Optional[str] = None) ->
                         LIMIT 10
                         """,
                         {"pid": product_id},
-                    ).data()
+                    )
                     items = [
                         {"product_id": r["product_id"], "score": 1.0, "reason": "same-category"}
-                        for r in rows
+                        for r in result
                     ]
 
             elif customer_id is not None:
-                # Recommend products co-occurring with customer's purchased products, excluding already purchased
-                rows = session.run(
+                # Recommend products co-occurring with customer's purchased products, excluding already purchased.
+                # The purchased set is collected once instead of re-matching it per candidate.
+                result = session.run(
                     """
-                    MATCH (c:Customer {id: $cid})-[:PLACED]->(:Order)-[:CONTAINS]->(p:Product)
+                    MATCH (:Customer {id: $cid})-[:PLACED]->(:Order)-[:CONTAINS]->(p:Product)
+                    WITH collect(DISTINCT p) AS purchased
+                    UNWIND purchased AS p
                     MATCH (p)<-[:CONTAINS]-(:Order)-[:CONTAINS]->(other:Product)
-                    WHERE NOT (c)-[:PLACED]->(:Order)-[:CONTAINS]->(other)
+                    WHERE NOT other IN purchased
                     RETURN other.id AS product_id, count(*) AS score
                     ORDER BY score DESC
                     LIMIT 10
                     """,
                     {"cid": customer_id},
-                ).data()
-                if rows:
-                    items = [
-                        {
-                            "product_id": r["product_id"],
-                            "score": float(r["score"]),
-                            "reason": "co-occurrence",
-                        }
-                        for r in rows
-                    ]
-                else:
+                )
+                items = [
+                    {
+                        "product_id": r["product_id"],
+                        "score": float(r["score"]),
+                        "reason": "co-occurrence",
+                    }
+                    for r in result
+                ]
+                if not items:
                     # Same-category fallback from user's purchased categories
-                    rows = session.run(
+                    result = session.run(
                         """
-                        MATCH (c:Customer {id: $cid})-[:PLACED]->(:Order)-[:CONTAINS]->(:Product)-[:IN_CATEGORY]->(cat)
-                        MATCH (other:Product)-[:IN_CATEGORY]->(cat)
-                        WHERE NOT (c)-[:PLACED]->(:Order)-[:CONTAINS]->(other)
+                        MATCH (:Customer {id: $cid})-[:PLACED]->(:Order)-[:CONTAINS]->(p:Product)
+                        WITH collect(DISTINCT p) AS purchased
+                        UNWIND purchased AS p
+                        MATCH (p)-[:IN_CATEGORY]->(cat)<-[:IN_CATEGORY]-(other:Product)
+                        WHERE NOT other IN purchased
                         RETURN DISTINCT other.id AS product_id
                         LIMIT 10
                         """,
                         {"cid": customer_id},
-                    ).data()
+                    )
                     items = [
                         {"product_id": r["product_id"], "score": 1.0, "reason": "same-category"}
-                        for r in rows
+                        for r in result
                     ]
             # else: neither provided -> return empty list
     except Exception:
         # Graceful degradation for demo purposes
         items = []
-    finally:
-        try:
-            driver.close()
-        except Exception:
-            pass
+    else:
+        if cache_key is not None:
+            with _REC_CACHE_LOCK:
+                _REC_CACHE[cache_key] = items
 
     took_ms = int((time.time() - started) * 1000)
     return {"items": items, "took_ms": took_ms}